@@ -3,16 +3,21 @@ import os
 import sys
 import time
 import json
-import sqlite3
+import socket
+import functools
 import asyncio
 import logging
+from logging.handlers import RotatingFileHandler
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import subprocess
+import aiosqlite
+import uvloop
+from icmplib import async_ping
 from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
 from telegram.constants import ParseMode
 from telegram.error import BadRequest
+from telegram.request import HTTPXRequest
 
 def load_device_config():
     """Load device configuration from file"""
@@ -39,8 +44,11 @@ CONFIG = {
     "telegram_base_file_url": os.environ.get("TELEGRAM_BASE_FILE_URL", "https://api.telegram.org/file/bot"),
     "monitored_devices": load_device_config(),
     "check_interval": 30,  # seconds
+    "max_check_interval": 120,  # seconds, upper bound while power is stable
     "ping_timeout": 5,     # seconds
     "ping_count": 5,       # number of pings per check
+    "history_cache_ttl": 60,  # seconds to reuse a rendered /history page
+    "dns_cache_ttl": 300,     # seconds to reuse a resolved address
     "db_path": "/var/lib/power_monitor/power_cuts.db",
     "log_path": "/var/log/power_monitor.log"
 }
@@ -55,121 +63,226 @@ if not CONFIG["telegram_chat_id"]:
     sys.exit(1)
 
 # Setup logging
+# The log file is size-capped; records are written unbuffered so nothing is
+# lost when systemd stops the service or the UPS runs out
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(CONFIG["log_path"]),
+        RotatingFileHandler(CONFIG["log_path"], maxBytes=5_000_000, backupCount=3),
         logging.StreamHandler(sys.stdout)
     ]
 )
 logger = logging.getLogger(__name__)
 
+class CachedResolverLoop(uvloop.Loop):
+    """uvloop event loop that caches getaddrinfo results for a short TTL
+
+    Only callers of loop.getaddrinfo() see the cache, which includes httpx
+    (through anyio) and therefore every Telegram API call. uvloop's own
+    create_connection() resolves internally and bypasses it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._addrinfo_cache = {}
+
+    async def getaddrinfo(self, host, port, *, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        cached = self._addrinfo_cache.get(key)
+        if cached and time.monotonic() - cached[0] < CONFIG["dns_cache_ttl"]:
+            return cached[1]
+
+        try:
+            result = await super().getaddrinfo(host, port, family=family, type=type, proto=proto, flags=flags)
+        except socket.gaierror:
+            # DNS is often flaky during a power cut; fall back to the last known address
+            if cached:
+                logger.warning(f"DNS lookup for {host} failed, using cached address")
+                return cached[1]
+            raise
+
+        self._addrinfo_cache[key] = (time.monotonic(), result)
+        return result
+
+class CachedResolverLoopPolicy(uvloop.EventLoopPolicy):
+    """Event loop policy creating CachedResolverLoop instances"""
+
+    def new_event_loop(self):
+        return CachedResolverLoop()
+
+# Keyboards never change, so build them once
+NOTIFICATION_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📊 Status", callback_data="status"),
+        InlineKeyboardButton("📈 History", callback_data="history")
+    ]
+])
+
+MAIN_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📊 Status", callback_data="status"),
+        InlineKeyboardButton("📈 History", callback_data="history")
+    ],
+    [
+        InlineKeyboardButton("🔧 Fix", callback_data="fix"),
+        InlineKeyboardButton("❓ Help", callback_data="help")
+    ]
+])
+
 class PowerMonitor:
     def __init__(self):
         self.db_path = CONFIG["db_path"]
+        # One bot with a pooled keep-alive HTTP client, shared with the
+        # command handlers so notifications reuse the same connections
         self.bot = Bot(
             token=CONFIG["telegram_bot_token"],
             base_url=CONFIG["telegram_base_url"],
             base_file_url=CONFIG["telegram_base_file_url"],
+            request=HTTPXRequest(connection_pool_size=8, pool_timeout=5),
         )
         self.chat_id = CONFIG["telegram_chat_id"]
         self.current_status = "UNKNOWN"
         self.last_outage_start = None
-        self.init_database()
-        self.handle_startup_recovery()
-
-    def init_database(self):
+        self.current_cut_id = None
+        self.stable_ticks = 0
+        # Set to cut the current sleep short, e.g. after /fix
+        self.recheck_event = asyncio.Event()
+        self.conn = None
+        # Bumped on every write so cached /history pages can tell they are stale
+        self.history_version = 0
+
+    async def initialize(self):
+        """Open the database and recover state from a previous run"""
+        await self.init_database()
+        await self.handle_startup_recovery()
+
+    async def close(self):
+        """Close the database connection"""
+        # aiosqlite's worker thread is not a daemon, so the process can't exit until it stops
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+
+    async def init_database(self):
         """Initialize SQLite database for storing power cut history"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        # Keep a single connection open for the lifetime of the monitor so
+        # SQLite's page cache stays warm; aiosqlite runs its queries on a
+        # background thread so the event loop never blocks on disk I/O
+        self.conn = await aiosqlite.connect(self.db_path, isolation_level=None)
+        # WAL lets /status and /history read while a power event is being
+        # written, and only needs one fsync per commit
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.execute("PRAGMA temp_store=MEMORY")
+        await self.conn.execute("PRAGMA mmap_size=134217728")  # 128 MiB
+        await self.conn.execute("PRAGMA cache_size=-8000")     # ~8 MiB
+        await self.conn.execute('''
             CREATE TABLE IF NOT EXISTS power_cuts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER,
                 duration_seconds INTEGER,
                 status TEXT DEFAULT 'ongoing'
             )
         ''')
-        conn.commit()
-        conn.close()
-        
-    def handle_startup_recovery(self):
+        # Timestamps are stored as Unix epoch seconds; convert rows written as
+        # ISO strings by older versions. Those wrote start_time in local time,
+        # but cuts closed at startup or by /fix got a UTC end_time from SQLite's
+        # datetime('now') (no fractional seconds, unlike Python's datetimes) and
+        # a duration skewed by the UTC offset, so recompute it for those rows
+        await self.conn.execute(
+            """UPDATE power_cuts
+               SET start_time = CAST(strftime('%s', start_time, 'utc') AS INTEGER)
+               WHERE typeof(start_time) = 'text'"""
+        )
+        await self.conn.execute(
+            """UPDATE power_cuts
+               SET end_time = CAST(strftime('%s', end_time) AS INTEGER),
+                   duration_seconds = CAST(strftime('%s', end_time) AS INTEGER) - start_time
+               WHERE typeof(end_time) = 'text' AND end_time NOT LIKE '%.%'"""
+        )
+        await self.conn.execute(
+            """UPDATE power_cuts
+               SET end_time = CAST(strftime('%s', end_time, 'utc') AS INTEGER)
+               WHERE typeof(end_time) = 'text'"""
+        )
+        # Ongoing cuts are looked up constantly but there is rarely more than one,
+        # so a partial index keeps that lookup tiny; history filters by start_time
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ongoing ON power_cuts(id DESC) WHERE status = 'ongoing'"
+        )
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_start_time ON power_cuts(start_time DESC)"
+        )
+
+    async def handle_startup_recovery(self):
         """Handle recovery from unexpected shutdowns"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check for any ongoing power cuts
-        cursor.execute(
-            """SELECT id, start_time FROM power_cuts 
-               WHERE status = 'ongoing' 
-               ORDER BY id DESC"""
+        # Close any power cuts left ongoing in a single statement
+        now = int(time.time())
+        cursor = await self.conn.execute(
+            """UPDATE power_cuts 
+               SET end_time = ?, 
+                   duration_seconds = ? - start_time,
+                   status = 'completed'
+               WHERE status = 'ongoing'""",
+            (now, now)
         )
-        ongoing_cuts = cursor.fetchall()
-        
-        if ongoing_cuts:
-            logger.info(f"Found {len(ongoing_cuts)} ongoing power cuts at startup")
-            
-            for cut_id, start_time in ongoing_cuts:
-                # Mark them as completed with recovery note
-                cursor.execute(
-                    """UPDATE power_cuts 
-                       SET end_time = datetime('now'), 
-                           duration_seconds = CAST((julianday(datetime('now')) - julianday(start_time)) * 86400 AS INTEGER),
-                           status = 'completed'
-                       WHERE id = ?""",
-                    (cut_id,)
-                )
-                
-            conn.commit()
-            logger.info("Closed all ongoing power cuts due to unexpected shutdown")
-            
-        conn.close()
 
-    def ping_device(self, ip: str) -> bool:
+        if cursor.rowcount > 0:
+            logger.info(f"Closed {cursor.rowcount} ongoing power cuts due to unexpected shutdown")
+
+    async def ping_device(self, ip: str) -> bool:
         """Ping a device and return True if reachable"""
         try:
-            result = subprocess.run(
-                ["ping", "-c", str(CONFIG["ping_count"]), "-W", str(CONFIG["ping_timeout"]), ip],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
+            host = await async_ping(
+                ip,
+                count=CONFIG["ping_count"],
+                timeout=CONFIG["ping_timeout"],
+                # Raw sockets need root/CAP_NET_RAW; otherwise fall back to ICMP datagram sockets
+                privileged=os.geteuid() == 0
             )
-            return result.returncode == 0
+            return host.is_alive
         except Exception as e:
             logger.error(f"Error pinging {ip}: {e}")
             return False
 
-    def check_power_status(self) -> bool:
+    async def check_power_status(self) -> bool:
         """Check if power is available by pinging monitored devices"""
-        reachable_count = 0
-        for device in CONFIG["monitored_devices"]:
-            if self.ping_device(device["ip"]):
-                reachable_count += 1
-                logger.debug(f"{device['name']} ({device['ip']}) is reachable")
-            else:
-                logger.debug(f"{device['name']} ({device['ip']}) is NOT reachable")
-
-        # Power is considered ON if at least one device is reachable
+        # Ping all devices concurrently and stop as soon as one responds
+        tasks = {
+            asyncio.create_task(self.ping_device(device["ip"])): device
+            for device in CONFIG["monitored_devices"]
+        }
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    device = tasks[task]
+                    reachable = not task.cancelled() and task.exception() is None and task.result()
+                    # Runs every check, so skip building log arguments unless DEBUG is on
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("%s (%s) reachable=%s", device['name'], device['ip'], reachable)
+                    if reachable:
+                        # Power is considered ON if at least one device is reachable
+                        return True
+        finally:
+            for task in pending:
+                task.cancel()
+            # Let cancelled pings run their cleanup before the next check
+            await asyncio.gather(*pending, return_exceptions=True)
+
         # Power is considered OFF if ALL devices are unreachable
-        return reachable_count > 0
+        return False
 
     async def send_telegram_message(self, message: str, include_keyboard: bool = True):
         """Send a message via Telegram"""
         try:
-            keyboard = None
-            if include_keyboard:
-                keyboard = [
-                    [
-                        InlineKeyboardButton("📊 Status", callback_data="status"),
-                        InlineKeyboardButton("📈 History", callback_data="history")
-                    ]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-            else:
-                reply_markup = None
-                
+            reply_markup = NOTIFICATION_KEYBOARD if include_keyboard else None
+
             await self.bot.send_message(
                 chat_id=self.chat_id,
                 text=message,
@@ -180,82 +293,67 @@ class PowerMonitor:
         except Exception as e:
             logger.error(f"Failed to send Telegram message: {e}")
 
-    def record_power_cut_start(self):
+    async def record_power_cut_start(self):
         """Record the start of a power cut"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         now = datetime.now()
-        cursor.execute(
+        cursor = await self.conn.execute(
             "INSERT INTO power_cuts (start_time) VALUES (?)",
-            (now,)
+            (int(now.timestamp()),)
         )
-        conn.commit()
         cut_id = cursor.lastrowid
-        conn.close()
+        self.history_version += 1
+        self.current_cut_id = cut_id
         self.last_outage_start = now
         return cut_id, now
 
-    def record_power_cut_end(self):
+    async def record_power_cut_end(self):
         """Record the end of a power cut"""
-        if not self.last_outage_start:
-            return None, None, None
+        if not self.last_outage_start or self.current_cut_id is None:
+            return None, None
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         now = datetime.now()
         duration = (now - self.last_outage_start).total_seconds()
 
-        cursor.execute(
+        await self.conn.execute(
             """UPDATE power_cuts
                SET end_time = ?, duration_seconds = ?, status = 'completed'
-               WHERE status = 'ongoing'
-               ORDER BY id DESC LIMIT 1""",
-            (now, int(duration))
+               WHERE id = ?""",
+            (int(now.timestamp()), int(duration), self.current_cut_id)
         )
-        conn.commit()
-        conn.close()
+        self.current_cut_id = None
+        self.history_version += 1
 
         return now, duration
 
     def get_current_status(self) -> Dict:
         """Get current power status and ongoing outage info"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """SELECT id, start_time FROM power_cuts
-               WHERE status = 'ongoing'
-               ORDER BY id DESC LIMIT 1"""
-        )
-        ongoing = cursor.fetchone()
-        conn.close()
-
-        if ongoing:
-            start_time = datetime.fromisoformat(ongoing[1])
-            duration = (datetime.now() - start_time).total_seconds()
+        # The monitor loop already tracks the ongoing outage, so answer from
+        # memory; ongoing rows left in the database are closed at startup
+        if self.current_status == "POWER_CUT" and self.last_outage_start:
+            duration = (datetime.now() - self.last_outage_start).total_seconds()
             return {
                 "status": "POWER_CUT",
-                "outage_start": start_time,
+                "outage_start": self.last_outage_start,
                 "duration_seconds": int(duration)
             }
         else:
             return {"status": "POWER_ON"}
 
-    def get_power_cut_history(self, days: int = 30) -> List[Dict]:
-        """Get power cut history for the last N days"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        since_date = datetime.now() - timedelta(days=days)
+    async def get_power_cut_history(self, days: int = 30, limit: int = -1, offset: int = 0) -> List[Dict]:
+        """Get power cut history for the last N days, newest first"""
+        since_date = int((datetime.now() - timedelta(days=days)).timestamp())
 
-        cursor.execute(
+        rows = await self.conn.execute_fetchall(
             """SELECT start_time, end_time, duration_seconds, status
                FROM power_cuts
                WHERE start_time > ?
-               ORDER BY start_time DESC""",
-            (since_date,)
+               ORDER BY start_time DESC
+               LIMIT ? OFFSET ?""",
+            (since_date, limit, offset)
         )
 
         cuts = []
-        for row in cursor.fetchall():
+        for row in rows:
             cuts.append({
                 "start_time": row[0],
                 "end_time": row[1],
@@ -263,23 +361,43 @@ class PowerMonitor:
                 "status": row[3]
             })
 
-        conn.close()
         return cuts
 
+    async def get_power_cut_stats(self, days: int = 30) -> Dict:
+        """Get power cut counts and total downtime for the last N days"""
+        since_date = int((datetime.now() - timedelta(days=days)).timestamp())
+
+        async with self.conn.execute(
+            """SELECT COUNT(*),
+                      COALESCE(SUM(status = 'completed'), 0),
+                      COALESCE(SUM(duration_seconds), 0)
+               FROM power_cuts
+               WHERE start_time > ?""",
+            (since_date,)
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        return {
+            "total_records": row[0],
+            "completed_cuts": row[1],
+            "total_duration": row[2]
+        }
+
     async def monitor_loop(self):
         """Main monitoring loop"""
         logger.info("Starting power monitoring...")
         await self.send_telegram_message("🔌 Power monitoring system started")
 
         while True:
+            previous_status = self.current_status
             try:
-                power_on = self.check_power_status()
+                power_on = await self.check_power_status()
 
                 if power_on and self.current_status == "POWER_CUT":
                     # Power restored
-                    end_time, duration = self.record_power_cut_end()
+                    end_time, duration = await self.record_power_cut_end()
                     if end_time:
-                        duration_str = self.format_duration(duration)
+                        duration_str = self.format_duration(int(duration))
                         message = (
                             f"✅ *Power Restored!*\n"
                             f"📅 Time: {end_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
@@ -290,7 +408,7 @@ class PowerMonitor:
 
                 elif not power_on and self.current_status != "POWER_CUT":
                     # Power cut detected
-                    cut_id, start_time = self.record_power_cut_start()
+                    cut_id, start_time = await self.record_power_cut_start()
                     message = (
                         f"🚨 *Power Cut Detected!*\n"
                         f"📅 Time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
@@ -303,15 +421,41 @@ class PowerMonitor:
                     # Initial status
                     self.current_status = "POWER_ON" if power_on else "POWER_CUT"
                     if self.current_status == "POWER_CUT":
-                        self.record_power_cut_start()
+                        await self.record_power_cut_start()
 
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
 
-            await asyncio.sleep(CONFIG["check_interval"])
+            if self.current_status != previous_status:
+                self.stable_ticks = 0
+            elif self.backoff_interval() < CONFIG["max_check_interval"]:
+                # Stop counting once the backoff has reached its ceiling
+                self.stable_ticks += 1
+
+            try:
+                await asyncio.wait_for(self.recheck_event.wait(), timeout=self.next_check_interval())
+            except asyncio.TimeoutError:
+                pass
+            self.recheck_event.clear()
+
+    def request_recheck(self):
+        """Reset the backoff and run the next check right away"""
+        self.stable_ticks = 0
+        self.recheck_event.set()
+
+    def next_check_interval(self) -> int:
+        """Back off while power stays on, check at the base rate otherwise"""
+        if self.current_status != "POWER_ON":
+            return CONFIG["check_interval"]
+        return min(CONFIG["max_check_interval"], self.backoff_interval())
+
+    def backoff_interval(self) -> int:
+        """Double the base interval for every 10 consecutive checks with no change"""
+        return CONFIG["check_interval"] * 2 ** (self.stable_ticks // 10)
 
     @staticmethod
-    def format_duration(seconds: float) -> str:
+    @functools.lru_cache(maxsize=1024)
+    def format_duration(seconds: int) -> str:
         """Format duration in a readable format"""
         hours = int(seconds // 3600)
         minutes = int((seconds % 3600) // 60)
@@ -330,11 +474,10 @@ class PowerMonitor:
 class TelegramBot:
     def __init__(self, monitor: PowerMonitor):
         self.monitor = monitor
+        self._history_cache = {}
         self.application = (
             Application.builder()
-            .token(CONFIG["telegram_bot_token"])
-            .base_url(CONFIG["telegram_base_url"])
-            .base_file_url(CONFIG["telegram_base_file_url"])
+            .bot(monitor.bot)
             .build()
         )
 
@@ -369,26 +512,59 @@ class TelegramBot:
 
     async def show_history_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE, page: int = 0, is_callback: bool = False):
         """Show paginated history"""
-        cuts = self.monitor.get_power_cut_history(30)
+        # History only changes on power events, so reuse a recently rendered page
+        cached = self._history_cache.get(page)
+        if (cached and cached["version"] == self.monitor.history_version
+                and time.monotonic() - cached["ts"] < CONFIG["history_cache_ttl"]):
+            message, keyboard = cached["message"], cached["keyboard"]
+        else:
+            message, keyboard = await self.render_history_page(page)
+            self._history_cache[page] = {
+                "message": message,
+                "keyboard": keyboard,
+                "version": self.monitor.history_version,
+                "ts": time.monotonic()
+            }
+
+        if is_callback:
+            # This is a callback query, edit the existing message
+            try:
+                await update.callback_query.edit_message_text(message, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+            except BadRequest as e:
+                if "Message is not modified" in str(e):
+                    # Message content is identical, just acknowledge the callback
+                    logger.debug("Message content unchanged, skipping edit")
+                else:
+                    # Re-raise other BadRequest errors
+                    raise
+        else:
+            # This is a regular command, send new message
+            await update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+
+    async def render_history_page(self, page: int):
+        """Build the history message and keyboard for a page"""
+        stats = await self.monitor.get_power_cut_stats(30)
+        total_records = stats["total_records"]
         items_per_page = 10
-        total_pages = (len(cuts) + items_per_page - 1) // items_per_page if cuts else 1
+        total_pages = (total_records + items_per_page - 1) // items_per_page if total_records else 1
         
         # Ensure page is within bounds
         page = max(0, min(page, total_pages - 1))
         
-        if not cuts:
+        if not total_records:
             message = "📊 *Power Cut History (Last 30 Days)*\n\nNo power cuts recorded."
             keyboard = self.get_keyboard()
         else:
-            start_idx = page * items_per_page
-            end_idx = min(start_idx + items_per_page, len(cuts))
-            page_cuts = cuts[start_idx:end_idx]
+            # Only fetch the rows shown on this page
+            page_cuts = await self.monitor.get_power_cut_history(
+                30, limit=items_per_page, offset=page * items_per_page
+            )
             
             message = f"📊 *Power Cut History (Last 30 Days)*\n"
             message += f"📄 Page {page + 1} of {total_pages}\n\n"
 
             for cut in page_cuts:
-                start_time = datetime.fromisoformat(cut["start_time"])
+                start_time = datetime.fromtimestamp(cut["start_time"])
                 status_icon = "🔴" if cut["status"] == "ongoing" else "✅"
 
                 message += f"{status_icon} *{start_time.strftime('%Y-%m-%d %H:%M')}*"
@@ -402,34 +578,21 @@ class TelegramBot:
                 message += "\n"
 
             # Add statistics
-            total_cuts = len([c for c in cuts if c["status"] == "completed"])
-            total_duration = sum(c["duration_seconds"] or 0 for c in cuts if c["duration_seconds"])
+            total_cuts = stats["completed_cuts"]
+            total_duration = stats["total_duration"]
             avg_duration = total_duration / total_cuts if total_cuts > 0 else 0
 
             message += (
                 f"\n📈 *Statistics:*\n"
                 f"Total Cuts: {total_cuts}\n"
                 f"Total Downtime: {self.monitor.format_duration(total_duration)}\n"
-                f"Average Duration: {self.monitor.format_duration(avg_duration)}"
+                f"Average Duration: {self.monitor.format_duration(int(avg_duration))}"
             )
             
             # Create pagination keyboard
             keyboard = self.get_history_keyboard(page, total_pages)
 
-        if is_callback:
-            # This is a callback query, edit the existing message
-            try:
-                await update.callback_query.edit_message_text(message, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
-            except BadRequest as e:
-                if "Message is not modified" in str(e):
-                    # Message content is identical, just acknowledge the callback
-                    logger.debug("Message content unchanged, skipping edit")
-                else:
-                    # Re-raise other BadRequest errors
-                    raise
-        else:
-            # This is a regular command, send new message
-            await update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+        return message, keyboard
 
     async def cmd_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
@@ -448,22 +611,23 @@ class TelegramBot:
     async def cmd_fix(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /fix command to reset stuck states"""
         # Close any ongoing power cuts
-        conn = sqlite3.connect(self.monitor.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        now = int(time.time())
+        cursor = await self.monitor.conn.execute(
             """UPDATE power_cuts 
-               SET end_time = datetime('now'), 
+               SET end_time = ?, 
                    status = 'completed',
-                   duration_seconds = CAST((julianday(datetime('now')) - julianday(start_time)) * 86400 AS INTEGER)
-               WHERE status = 'ongoing'"""
+                   duration_seconds = ? - start_time
+               WHERE status = 'ongoing'""",
+            (now, now)
         )
         affected = cursor.rowcount
-        conn.commit()
-        conn.close()
         
         # Reset monitor status
         self.monitor.current_status = "UNKNOWN"
         self.monitor.last_outage_start = None
+        self.monitor.current_cut_id = None
+        self.monitor.history_version += 1
+        self.monitor.request_recheck()
         
         message = (
             f"🔧 *Fix Applied*\n"
@@ -484,18 +648,8 @@ class TelegramBot:
         await update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN, reply_markup=self.get_keyboard())
 
     def get_keyboard(self):
-        """Create inline keyboard with command buttons"""
-        keyboard = [
-            [
-                InlineKeyboardButton("📊 Status", callback_data="status"),
-                InlineKeyboardButton("📈 History", callback_data="history")
-            ],
-            [
-                InlineKeyboardButton("🔧 Fix", callback_data="fix"),
-                InlineKeyboardButton("❓ Help", callback_data="help")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        """Get inline keyboard with command buttons"""
+        return MAIN_KEYBOARD
     
     def get_history_keyboard(self, current_page: int, total_pages: int):
         """Create pagination keyboard for history"""
@@ -568,13 +722,21 @@ class TelegramBot:
 async def main():
     """Main function"""
     monitor = PowerMonitor()
-    bot = TelegramBot(monitor)
+    try:
+        await monitor.initialize()
+        bot = TelegramBot(monitor)
 
-    # Run both the monitor and the bot concurrently
-    await asyncio.gather(
-        monitor.monitor_loop(),
-        bot.run()
-    )
+        # Run both the monitor and the bot concurrently
+        await asyncio.gather(
+            monitor.monitor_loop(),
+            bot.run()
+        )
+    finally:
+        await monitor.close()
 
 if __name__ == "__main__":
+    # uvloop has much cheaper socket I/O and task switching than the default loop;
+    # CachedResolverLoop adds a getaddrinfo cache on top so httpx doesn't resolve
+    # api.telegram.org for every Telegram call
+    asyncio.set_event_loop_policy(CachedResolverLoopPolicy())
     asyncio.run(main())
\ No newline at end of file